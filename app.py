@@ -2,19 +2,26 @@
 import sys
 import os
 import time
+import hashlib
+import itertools
 import logging
+import re
 import json
 import threading
+import queue
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 import subprocess
+import platform
+import socket
 import psutil
 import sqlite3
-import tkinter as tk
 import webbrowser
-from tkinter import filedialog
-from flask import Flask, jsonify, render_template, request, send_from_directory
+from flask import Flask, Response, jsonify, render_template, request, send_from_directory
 from flask_socketio import SocketIO
-from concurrent.futures import ThreadPoolExecutor
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
 
 # --- EXTERNAL LIBRARIES ---
 import pystray
@@ -24,6 +31,7 @@ import engineio.async_drivers.threading
 # --- SECURITY LIBRARIES ---
 from cryptography.hazmat.primitives import hashes, serialization
 from cryptography.hazmat.primitives.asymmetric import padding
+from cryptography.hazmat.primitives.asymmetric.utils import Prehashed
 from cryptography.exceptions import InvalidSignature
 
 # --- IMPORT MODULES ---
@@ -35,6 +43,19 @@ try:
 except ImportError:
     start_watcher = None
 
+# --- FAST JSON ---
+# orjson is several times faster than the stdlib for our config/library payloads
+try:
+    import orjson
+    def json_loads(data): return orjson.loads(data)
+    def json_dumps(obj, pretty=False):
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2 if pretty else 0)
+except ImportError:
+    orjson = None
+    def json_loads(data): return json.loads(data)
+    def json_dumps(obj, pretty=False):
+        return json.dumps(obj, indent=2 if pretty else None).encode('utf-8')
+
 # --- CONFIGURATION & CONSTANTS ---
 if os.name == 'nt':
     DATA_DIR = os.path.join(os.getenv('LOCALAPPDATA'), 'Game Hub')
@@ -54,6 +75,9 @@ STEAMGRIDDB_API_URL = "https://www.steamgriddb.com/api/v2"
 GITHUB_REPO = "zorkosss/GameHub"
 CURRENT_VERSION = "2.1" # Incremented for the new update
 PORT = 5000
+UPDATE_CHUNK_SIZE = 1 << 20 # 1 MiB reads for the installer download
+UPDATE_TIMEOUT = (5, 30) # (connect, read) seconds for the update downloads
+COVER_FETCH_WORKERS = 10 # Cover lookups in flight at once (network-bound, mostly waiting)
 HOST_URL = f"http://127.0.0.1:{PORT}"
 
 # --- SECURITY: PUBLIC KEY ---
@@ -86,6 +110,54 @@ socketio = SocketIO(app, cors_allowed_origins=[], async_mode='threading')
 scanner = GameScanner()
 all_games = []
 
+# --- SHARED WORKERS ---
+# Long-lived pools instead of a new thread (or a new executor) per job. Background jobs
+# (scans, cover runs, updates) and the cover HTTP fetches they wait on use separate
+# pools so a job can never block on work queued behind itself.
+_bg_pool = ThreadPoolExecutor(max_workers=4, thread_name_prefix='bg')
+_cover_pool = ThreadPoolExecutor(max_workers=COVER_FETCH_WORKERS, thread_name_prefix='cover')
+# Persistent HTTP sessions keep TCP/TLS connections alive between calls
+def _make_session(headers=None):
+    session = requests.Session()
+    # Pool big enough for every cover worker to hold a connection; transient errors/rate limits are retried
+    session.mount("https://", HTTPAdapter(
+        pool_connections=8, pool_maxsize=16,
+        max_retries=Retry(total=2, backoff_factor=0.3, status_forcelist=[429, 502, 503])
+    ))
+    if headers:
+        session.headers.update(headers)
+    return session
+
+_sgdb_session = _make_session()
+_github_session = _make_session({'User-Agent': 'GameHub'})
+
+def _log_job_error(future):
+    exc = future.exception()
+    if exc:
+        logging.error(f"Background job failed: {exc!r}")
+
+def run_in_background(fn, *args):
+    future = _bg_pool.submit(fn, *args)
+    future.add_done_callback(_log_job_error)
+    return future
+_games_by_key = {} # (name, source) -> Game, rebuilt whenever all_games is replaced
+# Held while all_games / _games_by_key are changed, so the list and the index never disagree
+_library_lock = threading.Lock()
+
+def _index_games():
+    global _games_by_key
+    _games_by_key = {(g.name, g.source): g for g in all_games}
+    touch_library()
+
+# Bumped whenever the library or a game in it changes; doubles as the /api/games ETag
+_library_versions = itertools.count(1)
+_library_version = 0
+_games_payload = (None, b'') # (version, serialized /api/games body)
+
+def touch_library():
+    global _library_version
+    _library_version = next(_library_versions)
+
 # --- SECURITY: ORIGIN CHECK ---
 @app.before_request
 def check_origin():
@@ -104,13 +176,46 @@ def check_origin():
         return jsonify({"error": "Unauthorized Access"}), 403
 
 # --- DATABASE FUNCTIONS ---
+# Hot-path SQL lives at module scope so sqlite3's statement cache keeps hitting
+_SQL_UPSERT_GAME = '''
+    INSERT OR REPLACE INTO games 
+    (id, name, source, launch_id, install_path, favorite, hidden, last_played, playtime_seconds, grid_image_url, avg_fps, best_ping)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+'''
+_SQL_SELECT_ALL = '''
+    SELECT id, name, source, launch_id, install_path, favorite, hidden, last_played, playtime_seconds, grid_image_url, avg_fps, best_ping
+    FROM games
+'''
+_SQL_DELETE_MANUAL_GAME = "DELETE FROM games WHERE name = ? AND source = 'Other Games'"
+_SQL_UPDATE_GAME_FLAGS = "UPDATE games SET favorite = ?, hidden = ?, avg_fps = ?, best_ping = ? WHERE id = ?"
+_SQL_UPDATE_PLAYTIME = "UPDATE games SET playtime_seconds = ?, last_played = ? WHERE id = ?"
+_SQL_UPDATE_COVER = "UPDATE games SET grid_image_url = ? WHERE id = ?"
+
+# One long-lived connection shared by every thread instead of reconnecting on every call.
+# Request, timer and tracker threads are short-lived, so a per-thread connection would be
+# opened (and configured) again for nearly every write. Writes hold _db_lock for their whole
+# transaction; the startup steps below run before any other thread touches the DB.
+_db_conn = None
+_db_lock = threading.RLock()
+
 def get_db_connection():
-    conn = sqlite3.connect(DATABASE_FILE, check_same_thread=False)
-    conn.row_factory = sqlite3.Row
-    return conn
+    global _db_conn
+    with _db_lock:
+        if _db_conn is None:
+            conn = sqlite3.connect(DATABASE_FILE, check_same_thread=False, cached_statements=256)
+            conn.executescript('''
+                PRAGMA synchronous=NORMAL;
+                PRAGMA temp_store=MEMORY;
+                PRAGMA cache_size=-20000;
+                PRAGMA mmap_size=268435456;
+            ''')
+            _db_conn = conn
+        return _db_conn
 
 def init_db():
     conn = get_db_connection()
+    # WAL is stored in the database file, so it only needs setting once
+    conn.execute("PRAGMA journal_mode=WAL")
     cursor = conn.cursor()
     cursor.execute('''
         CREATE TABLE IF NOT EXISTS games (
@@ -126,8 +231,9 @@ def init_db():
             grid_image_url TEXT
         )
     ''')
+    # Lookups/deletes filter by (name, source), not by the id primary key
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_games_name_source ON games(name, source)")
     conn.commit()
-    conn.close()
 
 def check_and_update_db_schema():
     conn = get_db_connection()
@@ -135,7 +241,7 @@ def check_and_update_db_schema():
     
     # Get list of columns
     cursor.execute("PRAGMA table_info(games)")
-    columns = [row['name'] for row in cursor.fetchall()]
+    columns = [row[1] for row in cursor.fetchall()] # (cid, name, type, ...)
     
     # Add 'avg_fps' if missing
     if 'avg_fps' not in columns:
@@ -148,14 +254,13 @@ def check_and_update_db_schema():
         cursor.execute("ALTER TABLE games ADD COLUMN best_ping TEXT")
         
     conn.commit()
-    conn.close()
 
 def migrate_json_to_db():
     if os.path.exists(OLD_CACHE_FILE):
         logging.info("Found old JSON cache. Migrating to Database...")
         try:
-            with open(OLD_CACHE_FILE, 'r') as f:
-                data = json.load(f)
+            with open(OLD_CACHE_FILE, 'rb') as f:
+                data = json_loads(f.read())
             
             conn = get_db_connection()
             cursor = conn.cursor()
@@ -179,7 +284,6 @@ def migrate_json_to_db():
                     g_data.get('grid_image_url', '')
                 ))
             conn.commit()
-            conn.close()
             os.rename(OLD_CACHE_FILE, OLD_CACHE_FILE + ".bak")
             logging.info("Migration complete.")
         except Exception as e:
@@ -190,166 +294,348 @@ def load_games_from_db():
     try:
         conn = get_db_connection()
         cursor = conn.cursor()
-        cursor.execute("SELECT * FROM games")
-        rows = cursor.fetchall()
+        cursor.execute(_SQL_SELECT_ALL)
         
         loaded_games = []
-        for row in rows:
-            # Create the Game Object with basic data
-            g = Game(
-                name=row['name'],
-                source=row['source'],
-                launch_id=row['launch_id'],
-                install_path=row['install_path']
-            )
-            
-            # Load User Data
-            g.favorite = bool(row['favorite'])
-            g.hidden = bool(row['hidden'])
-            g.last_played = row['last_played']
-            g.playtime_seconds = row['playtime_seconds']
-            g.grid_image_url = row['grid_image_url']
-            
-            # --- NEW PERFORMANCE DATA ---
-            # We check if the column exists in the row keys first (safety check)
-            # Then we check if the value is not None. If None, use ""
-            keys = row.keys()
-            
-            if 'avg_fps' in keys and row['avg_fps']:
-                g.avg_fps = row['avg_fps']
-            else:
-                g.avg_fps = ""
-
-            if 'best_ping' in keys and row['best_ping']:
-                g.best_ping = row['best_ping']
-            else:
-                g.best_ping = ""
+        while True:
+            rows = cursor.fetchmany(512)
+            if not rows:
+                break
+            # Columns come back in _SQL_SELECT_ALL order; the schema is ensured by check_and_update_db_schema
+            for (uid, name, source, launch_id, install_path, favorite, hidden,
+                 last_played, playtime_seconds, grid_image_url, avg_fps, best_ping) in rows:
+                # Create the Game Object with basic data
+                g = Game(name=name, source=source, launch_id=launch_id, install_path=install_path)
+                
+                # Load User Data
+                g.favorite = bool(favorite)
+                g.hidden = bool(hidden)
+                g.last_played = last_played
+                g.playtime_seconds = playtime_seconds
+                g.grid_image_url = grid_image_url
+                
+                # --- PERFORMANCE DATA ---
+                # NULL columns (rows written before the migration) become ""
+                g.avg_fps = avg_fps or ""
+                g.best_ping = best_ping or ""
 
-            loaded_games.append(g)
+                loaded_games.append(g)
             
         all_games = loaded_games
-        conn.close()
         logging.info(f"Loaded {len(all_games)} games from Database.")
     except Exception as e:
         logging.error(f"DB Load Error: {e}")
         all_games = []
+    _index_games()
 
-def save_games_to_db():
+def save_games_to_db(games=None):
+    # Saves the given games, or the whole library when none are passed
+    if games is None:
+        games = all_games
     try:
         conn = get_db_connection()
-        cursor = conn.cursor()
-        for g in all_games:
-            uid = f"{g.source}|{g.name}"
-            cursor.execute('''
-                INSERT OR REPLACE INTO games 
-                (id, name, source, launch_id, install_path, favorite, hidden, last_played, playtime_seconds, grid_image_url, avg_fps, best_ping)
-                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-            ''', (
-                uid, g.name, g.source, str(g.launch_id), g.install_path, 
+        # Single transaction for the whole batch (one journal flush instead of N)
+        with _db_lock, conn:
+            conn.executemany(_SQL_UPSERT_GAME, ((
+                g.unique_id, g.name, g.source, str(g.launch_id), g.install_path, 
                 g.favorite, g.hidden, g.last_played, g.playtime_seconds, g.grid_image_url,
-                getattr(g, 'avg_fps', ""), getattr(g, 'best_ping', "")
-            ))
-        conn.commit()
-        conn.close()
+                g.avg_fps, g.best_ping
+            ) for g in games))
     except Exception as e:
         logging.error(f"DB Save Error: {e}")
 
+# Single-row writes for changes that touch one game, instead of rewriting the whole library
+def save_game_flags_to_db(g):
+    try:
+        conn = get_db_connection()
+        with _db_lock, conn:
+            conn.execute(_SQL_UPDATE_GAME_FLAGS, (
+                g.favorite, g.hidden, g.avg_fps, g.best_ping, g.unique_id
+            ))
+    except Exception as e:
+        logging.error(f"DB Update Error: {e}")
+
+def save_playtime_to_db(g):
+    try:
+        conn = get_db_connection()
+        with _db_lock, conn:
+            conn.execute(_SQL_UPDATE_PLAYTIME, (g.playtime_seconds, g.last_played, g.unique_id))
+    except Exception as e:
+        logging.error(f"DB Update Error: {e}")
+
+# Covers arrive in bursts during a fetch run, so they are collected and written together
+COVER_FLUSH_DELAY = 2.0 # seconds
+_dirty_covers = {} # unique_id -> Game
+_dirty_covers_lock = threading.Lock()
+_cover_flush_timer = None
+
+def mark_cover_dirty(g):
+    global _cover_flush_timer
+    with _dirty_covers_lock:
+        _dirty_covers[g.unique_id] = g
+        # Not re-armed on later covers, so nothing waits longer than COVER_FLUSH_DELAY
+        if _cover_flush_timer is None:
+            _cover_flush_timer = threading.Timer(COVER_FLUSH_DELAY, flush_dirty_covers)
+            _cover_flush_timer.daemon = True
+            _cover_flush_timer.start()
+
+def flush_dirty_covers():
+    global _cover_flush_timer
+    with _dirty_covers_lock:
+        games = list(_dirty_covers.values())
+        _dirty_covers.clear()
+        if _cover_flush_timer is not None:
+            _cover_flush_timer.cancel()
+            _cover_flush_timer = None
+    if not games:
+        return
+    try:
+        conn = get_db_connection()
+        with _db_lock, conn:
+            conn.executemany(_SQL_UPDATE_COVER, ((g.grid_image_url, g.unique_id) for g in games))
+    except Exception as e:
+        logging.error(f"DB Update Error: {e}")
+
 # --- HELPER FUNCTIONS ---
 def load_config():
     try:
-        with open(CONFIG_FILE, 'r') as f:
-            return json.load(f)
+        with open(CONFIG_FILE, 'rb') as f:
+            return json_loads(f.read())
     except:
         return {}
 
 def save_config(config):
     try:
-        with open(CONFIG_FILE, 'w') as f:
-            json.dump(config, f, indent=4)
+        with open(CONFIG_FILE, 'wb') as f:
+            f.write(json_dumps(config, pretty=True))
     except Exception as e:
         logging.error(f"Failed to save config: {e}")
 
-def _fetch_grid_image(game: Game, api_key: str):
-    if game.grid_image_url and game.grid_image_url != "":
-        return
+# Parsed manual_games.json, kept between requests and re-read only when the file's mtime changes
+_manual_games_cache = {'mtime': None, 'games': {}}
+_manual_games_lock = threading.Lock()
+
+def load_manual_games():
+    try:
+        mtime = os.stat(MANUAL_GAMES_FILE).st_mtime_ns
+    except OSError:
+        return {}
+    if _manual_games_cache['mtime'] != mtime:
+        with open(MANUAL_GAMES_FILE, 'rb') as f:
+            _manual_games_cache['games'] = json_loads(f.read())
+        _manual_games_cache['mtime'] = mtime
+    return dict(_manual_games_cache['games'])
+
+def save_manual_games(manual_games):
+    # Write to a temp file and swap it in so readers never see a half-written file
+    tmp_path = MANUAL_GAMES_FILE + '.tmp'
+    with open(tmp_path, 'wb') as f:
+        f.write(json_dumps(manual_games, pretty=True))
+    os.replace(tmp_path, MANUAL_GAMES_FILE)
+    _manual_games_cache['games'] = manual_games
+    _manual_games_cache['mtime'] = os.stat(MANUAL_GAMES_FILE).st_mtime_ns
+
+STEAM_GRID_BATCH_SIZE = 20 # Steam app ids per /grids/steam request
+COVER_EMIT_INTERVAL = 1.0 # seconds between covers_delta pushes during a fetch run
+_sgdb_resume_at = 0.0 # monotonic time before which SteamGridDB asked us to hold off
+
+def _sgdb_get(path, **kwargs):
+    global _sgdb_resume_at
+    # Wait out an exhausted rate-limit window instead of sleeping between batches
+    delay = _sgdb_resume_at - time.monotonic()
+    if delay > 0:
+        time.sleep(delay)
+    
+    res = _sgdb_session.get(f"{STEAMGRIDDB_API_URL}{path}", timeout=5, **kwargs)
+    if res.headers.get('X-RateLimit-Remaining') == '0':
+        try: hold_off = float(res.headers.get('Retry-After', 1))
+        except ValueError: hold_off = 1.0
+        _sgdb_resume_at = time.monotonic() + hold_off
+    return res
 
-    headers = {'Authorization': f'Bearer {api_key}'}
+def _fetch_steam_grid_batch(games):
+    """Looks up covers for several Steam games in one request. Games it can't resolve keep an empty URL."""
+    try:
+        ids = ",".join(str(g.launch_id) for g in games)
+        res = _sgdb_get(f"/grids/steam/{ids}", params={'dimensions': '600x900'})
+        if not res.ok:
+            return
+        data = res.json().get('data') or []
+        # A multi-id lookup returns one {success, data} entry per id, in request order
+        if len(games) == 1:
+            data = [{'data': data}]
+        for game, entry in zip(games, data):
+            grids = entry.get('data') if isinstance(entry, dict) else None
+            if grids:
+                game.grid_image_url = grids[0]['url']
+    except Exception as e:
+        logging.warning(f"Error fetching Steam covers: {e}")
+
+def _fetch_grid_by_name(game: Game):
     found = False
     try:
-        if game.source == "Steam":
-            res = requests.get(f"{STEAMGRIDDB_API_URL}/grids/steam/{game.launch_id}", headers=headers, params={'dimensions': '600x900'}, timeout=3)
-            if res.ok:
-                data = res.json().get('data')
-                if data:
-                    game.grid_image_url = data[0]['url']
-                    found = True
-        
-        if not found:
-            res = requests.get(f"{STEAMGRIDDB_API_URL}/search/autocomplete/{game.name}", headers=headers, timeout=3)
-            if res.ok:
-                data = res.json().get('data')
-                if data:
-                    game_id = data[0]['id']
-                    grid_res = requests.get(f"{STEAMGRIDDB_API_URL}/grids/game/{game_id}", headers=headers, params={'dimensions': '600x900'}, timeout=3)
-                    if grid_res.ok:
-                        grid_data = grid_res.json().get('data')
-                        if grid_data:
-                            game.grid_image_url = grid_data[0]['url']
-                            found = True
+        res = _sgdb_get(f"/search/autocomplete/{game.name}")
+        if res.ok:
+            data = res.json().get('data')
+            if data:
+                game_id = data[0]['id']
+                grid_res = _sgdb_get(f"/grids/game/{game_id}", params={'dimensions': '600x900'})
+                if grid_res.ok:
+                    grid_data = grid_res.json().get('data')
+                    if grid_data:
+                        game.grid_image_url = grid_data[0]['url']
+                        found = True
     except Exception as e:
         logging.warning(f"Error fetching cover: {e}")
 
     if not found:
         game.grid_image_url = "MISSING"
 
+# Games waiting for a cover. Scans only append to it and a single cover run drains it,
+# so overlapping scans never look up the same game twice.
+_pending_covers = deque()
+_pending_covers_lock = threading.Lock()
+_cover_run_active = False
+
+def request_missing_covers(games, api_key):
+    global _cover_run_active
+    with _pending_covers_lock:
+        _pending_covers.extend(games)
+        if _cover_run_active:
+            return # the run in progress picks these up
+        _cover_run_active = True
+    run_in_background(fetch_missing_covers, api_key)
+
 def fetch_missing_covers(api_key):
+    global _cover_run_active
+    _sgdb_session.headers.update({'Authorization': f'Bearer {api_key}'})
     while True:
-        queue = [g for g in all_games if not g.grid_image_url or g.grid_image_url == ""]
-        if not queue:
-            break
-        
-        batch = queue[:5] 
-        with ThreadPoolExecutor(max_workers=5) as executor:
-            list(executor.map(lambda g: _fetch_grid_image(g, api_key), batch))
-        
-        save_games_to_db()
-        socketio.emit('scan_complete', {'message': 'Covers updated'})
-        time.sleep(1.5)
+        with _pending_covers_lock:
+            if not _pending_covers:
+                _cover_run_active = False
+                return
+            games = list({g.unique_id: g for g in _pending_covers}.values())
+            _pending_covers.clear()
+        # Skip games that got a cover or left the library since they were queued
+        games = [g for g in games if not g.grid_image_url and _games_by_key.get((g.name, g.source)) is g]
+        try: _fetch_covers(games)
+        except Exception as e: logging.error(f"Cover fetch failed: {e}")
+
+def _fetch_covers(games):
+    # Steam games are resolved by app id in batches; the rest (and Steam misses) go through name search
+    steam_games = [g for g in games if g.source == "Steam" and g.launch_id]
+    other_games = [g for g in games if not (g.source == "Steam" and g.launch_id)]
+    
+    # Concurrency is bounded by the cover pool, so everything can be queued up front
+    pending = {}
+    for i in range(0, len(steam_games), STEAM_GRID_BATCH_SIZE):
+        batch = steam_games[i:i + STEAM_GRID_BATCH_SIZE]
+        pending[_cover_pool.submit(_fetch_steam_grid_batch, batch)] = batch
+    for g in other_games:
+        pending[_cover_pool.submit(_fetch_grid_by_name, g)] = [g]
+    
+    # Finished covers are pushed in small batches; the UI patches those cards in place
+    fetched = []
+    last_emit = time.monotonic()
+    while pending:
+        done, _ = wait(pending, timeout=COVER_EMIT_INTERVAL, return_when=FIRST_COMPLETED)
+        for future in done:
+            for g in pending.pop(future):
+                if not g.grid_image_url:
+                    pending[_cover_pool.submit(_fetch_grid_by_name, g)] = [g]
+                    continue
+                mark_cover_dirty(g) # DB writes are batched too
+                touch_library()
+                fetched.append({'id': g.unique_id, 'url': g.grid_image_url})
+        if fetched and time.monotonic() - last_emit >= COVER_EMIT_INTERVAL:
+            socketio.emit('covers_delta', fetched)
+            fetched = []
+            last_emit = time.monotonic()
+    
+    flush_dirty_covers()
+    if fetched:
+        socketio.emit('covers_delta', fetched)
 
 # --- BACKGROUND SCANNER ---
+# Scans patch the shared library in place, so only one runs at a time. A refresh that
+# arrives mid-scan is folded into a single follow-up pass instead of running alongside it.
+_scan_lock = threading.Lock()
+_scan_active = False
+_scan_rerun = False
+
+def request_library_scan():
+    global _scan_active, _scan_rerun
+    with _scan_lock:
+        if _scan_active:
+            _scan_rerun = True # the scan in progress runs once more when it finishes
+            return
+        _scan_active = True
+    run_in_background(run_library_scans)
+
+def run_library_scans():
+    global _scan_active, _scan_rerun
+    while True:
+        try: scan_library_background()
+        except Exception as e: logging.error(f"Library scan failed: {e}")
+        with _scan_lock:
+            if not _scan_rerun:
+                _scan_active = False
+                return
+            _scan_rerun = False
+
 def scan_library_background():
+    global _games_by_key
     with app.app_context():
-        global all_games
         logging.info("--- Starting Background Library Scan ---")
         
         config = load_config()
         scanned_games = scanner.find_all_games(config)
         
-        existing_data = { (g.name, g.source): g for g in all_games }
-        updated_list = []
+        # Diff the scan against the current library into a fresh index, then publish it together
+        # with the list. Existing Game objects are kept (with their user data); only what the
+        # scanner knows is refreshed.
+        added, updated = [], []
+        index = {}
         
-        for s_game in scanned_games:
-            key = (s_game.name, s_game.source)
-            if key in existing_data:
-                e_game = existing_data[key]
-                s_game.favorite = e_game.favorite
-                s_game.hidden = e_game.hidden
-                s_game.playtime_seconds = e_game.playtime_seconds
-                s_game.last_played = e_game.last_played
-                if e_game.grid_image_url:
-                    s_game.grid_image_url = e_game.grid_image_url
-            updated_list.append(s_game)
+        with _library_lock:
+            for s_game in scanned_games:
+                key = (s_game.name, s_game.source)
+                if key in index:
+                    continue # Same library reachable through two scan paths
+                
+                e_game = _games_by_key.get(key)
+                if e_game is None:
+                    added.append(s_game)
+                    index[key] = s_game
+                    continue
+                
+                if str(e_game.launch_id) != str(s_game.launch_id) or e_game.install_path != s_game.install_path:
+                    e_game.launch_id = s_game.launch_id
+                    e_game.install_path = s_game.install_path
+                    updated.append(e_game)
+                index[key] = e_game
+            
+            removed = [key for key in _games_by_key if key not in index]
+            _games_by_key = index
+            all_games[:] = index.values()
+            if added or updated or removed:
+                touch_library()
         
-        all_games = updated_list
-        save_games_to_db()
+        # Only the new and changed rows need writing
+        if added or updated:
+            save_games_to_db(added + updated)
         
-        socketio.emit('scan_complete', {'message': 'Scan complete'})
+        socketio.emit('scan_delta', {
+            'added': [g.to_dict() for g in added],
+            'removed': [{'name': name, 'source': source} for name, source in removed],
+            'updated': [g.to_dict() for g in updated]
+        })
         
         api_key = config.get('steamgriddb_api_key')
         if api_key:
-            missing_count = len([g for g in all_games if not g.grid_image_url or g.grid_image_url == ""])
-            if missing_count > 0:
-                threading.Thread(target=fetch_missing_covers, args=(api_key,)).start()
+            missing = [g for g in all_games if not g.grid_image_url]
+            if missing:
+                request_missing_covers(missing, api_key)
 
 # --- CLASSES ---
 class AppTray:
@@ -365,7 +651,7 @@ class AppTray:
         dc.ellipse((8, 8, 56, 56), fill=(88, 101, 242))
         return image
     def on_open(self, icon, item): webbrowser.open(HOST_URL)
-    def on_quit(self, icon, item): icon.stop(); os._exit(0)
+    def on_quit(self, icon, item): icon.stop(); flush_dirty_covers(); os._exit(0)
     def run(self):
         image = self.create_image()
         menu = pystray.Menu(
@@ -375,56 +661,119 @@ class AppTray:
         self.icon = pystray.Icon("Game Hub", image, "Game Hub", menu)
         self.icon.run()
 
+class FileDialogHost(threading.Thread):
+    """
+    Owns a single hidden Tk root for the app's lifetime so /api/browse doesn't pay Tk startup per click.
+    Tk objects must only be touched from the thread that created them, so dialogs are requested via a queue.
+    Tk is imported and the thread started on the first dialog, so sessions that never browse never load it.
+    """
+    def __init__(self):
+        super().__init__(daemon=True)
+        self.requests = queue.Queue()
+        self.root = None
+        self.filedialog = None
+        self._launched = False
+        self._launch_lock = threading.Lock()
+
+    def run(self):
+        try:
+            import tkinter as tk
+            from tkinter import filedialog
+            self.filedialog = filedialog
+            self.root = tk.Tk(); self.root.withdraw(); self.root.attributes('-topmost', True)
+        except Exception as e:
+            # No Tk available: fail every dialog request instead of leaving callers blocked
+            while True:
+                _, reply = self.requests.get()
+                reply.put(e)
+        self.root.after(0, self._poll)
+        self.root.mainloop()
+
+    def _poll(self):
+        while True:
+            try: kwargs, reply = self.requests.get_nowait()
+            except queue.Empty: break
+            try: reply.put(self.filedialog.askopenfilename(parent=self.root, **kwargs))
+            except Exception as e: reply.put(e)
+        self.root.after(100, self._poll)
+
+    def ask_open_filename(self, **kwargs):
+        with self._launch_lock:
+            if not self._launched:
+                self.start()
+                self._launched = True
+        reply = queue.Queue(maxsize=1)
+        self.requests.put((kwargs, reply))
+        result = reply.get()
+        if isinstance(result, Exception): raise result
+        return result
+
+file_dialogs = FileDialogHost()
+
+PROCESS_POLL_SECONDS = 5
+PROCESS_DETECT_TICKS = 12 # give the launcher a minute to start the game
+
 class PlaytimeTracker(threading.Thread):
     def __init__(self, game_name, source, install_path):
         super().__init__(daemon=True)
         self.game_name = game_name
         self.source = source
-        self.install_path = os.path.normpath(install_path) if install_path else None
+        # Case-folded once with a trailing separator so each exe check is a plain prefix test
+        self.install_path = os.path.join(os.path.normcase(os.path.normpath(install_path)), '') if install_path else None
         self.game_processes = set()
         self.start_time = 0
 
     def run(self):
         self.start_time = time.time()
         if not self.detect_game_process(): return
-        while True:
-            time.sleep(5)
-            try:
-                self.game_processes = {p for p in self.game_processes if p.is_running()}
-                if not self.game_processes: break
-            except: break 
+        # Block on the process handles until every game process has exited
+        try: psutil.wait_procs(list(self.game_processes))
+        except psutil.Error: pass
         self.update_local_playtime(int(time.time() - self.start_time))
 
     def detect_game_process(self):
-        for _ in range(12): 
-            time.sleep(5)
-            for proc in psutil.process_iter(['pid', 'name', 'exe']):
+        if not self.install_path: return False
+        seen_pids = set()
+        for _ in range(PROCESS_DETECT_TICKS):
+            time.sleep(PROCESS_POLL_SECONDS)
+            # Only inspect PIDs that appeared since the last tick (all of them on the first one)
+            current_pids = set(psutil.pids())
+            new_pids = current_pids - seen_pids
+            seen_pids = current_pids
+            for pid in new_pids:
                 try:
-                    p_exe = proc.info.get('exe')
-                    if p_exe and self.install_path and os.path.normpath(p_exe).startswith(self.install_path):
-                        process = psutil.Process(proc.info['pid'])
+                    process = psutil.Process(pid)
+                    p_exe = process.exe()
+                    if p_exe and os.path.normcase(p_exe).startswith(self.install_path):
                         self.game_processes.update([process] + process.children(recursive=True))
-                except: continue
+                except (psutil.Error, OSError): continue
             if self.game_processes: return True
         return False
 
     def update_local_playtime(self, duration):
-        global all_games; found = False
-        for game in all_games:
-            if game.name == self.game_name and game.source == self.source:
-                game.playtime_seconds = (game.playtime_seconds or 0) + duration
-                game.last_played = time.time()
-                found = True; break
-        if found: save_games_to_db(); socketio.emit('game_updated', game.to_dict())
+        game = _games_by_key.get((self.game_name, self.source))
+        if game is not None:
+            game.playtime_seconds = (game.playtime_seconds or 0) + duration
+            game.last_played = time.time()
+            touch_library()
+            save_playtime_to_db(game); socketio.emit('game_updated', game.to_dict())
 
 # --- API ROUTES ---
 @app.route('/api/games')
 def get_games():
-    return jsonify([g.to_dict() for g in all_games])
+    global _games_payload
+    # Serialized once per library version; a client holding the current ETag gets a 304
+    version = _library_version
+    if _games_payload[0] != version:
+        _games_payload = (version, json_dumps([g.to_dict() for g in all_games]))
+    response = Response(_games_payload[1], mimetype='application/json')
+    response.set_etag(str(_games_payload[0]))
+    response.cache_control.no_cache = True
+    return response.make_conditional(request)
 
 @app.route('/api/refresh', methods=['POST'])
 def refresh_games():
-    threading.Thread(target=scan_library_background).start()
+    request_library_scan()
     return jsonify({"status": "success"})
 
 @app.route('/api/update_game', methods=['POST'])
@@ -434,23 +783,24 @@ def update_game():
     game_source = data.get('source')
     update_data = data.get('update_data')
     
-    for game in all_games:
-        # Find the specific game in the list
-        if game.name == game_name and game.source == game_source:
-            
-            # --- EXISTING UPDATES ---
-            if 'favorite' in update_data: game.favorite = update_data['favorite']
-            if 'hidden' in update_data: game.hidden = update_data['hidden']
-            
-            # --- NEW PERFORMANCE UPDATES (ADD THESE LINES) ---
-            if 'avg_fps' in update_data: game.avg_fps = update_data['avg_fps']
-            if 'best_ping' in update_data: game.best_ping = update_data['best_ping']
-            
-            # Save changes to database
-            save_games_to_db()
-            return jsonify({"status": "success"})
-            
-    return jsonify({"status": "error"}), 404
+    # Find the specific game in the index
+    game = _games_by_key.get((game_name, game_source))
+    if game is None:
+        return jsonify({"status": "error"}), 404
+    
+    # --- EXISTING UPDATES ---
+    if 'favorite' in update_data: game.favorite = update_data['favorite']
+    if 'hidden' in update_data: game.hidden = update_data['hidden']
+    
+    # --- NEW PERFORMANCE UPDATES (ADD THESE LINES) ---
+    if 'avg_fps' in update_data: game.avg_fps = update_data['avg_fps']
+    if 'best_ping' in update_data: game.best_ping = update_data['best_ping']
+    touch_library()
+    
+    # Save changes to database
+    save_game_flags_to_db(game)
+    return jsonify({"status": "success"})
+
 @app.route('/api/settings', methods=['GET', 'POST'])
 def handle_settings():
     config = load_config()
@@ -472,15 +822,10 @@ def add_game():
         return jsonify({"status": "error", "message": "Invalid path or name"}), 400
         
     try:
-        manual_games = {}
-        if os.path.exists(MANUAL_GAMES_FILE):
-            with open(MANUAL_GAMES_FILE, 'r') as f:
-                manual_games = json.load(f)
-        
-        manual_games[name] = path
-        
-        with open(MANUAL_GAMES_FILE, 'w') as f:
-            json.dump(manual_games, f, indent=4)
+        with _manual_games_lock:
+            manual_games = load_manual_games()
+            manual_games[name] = path
+            save_manual_games(manual_games)
             
         return jsonify({"status": "success"})
     except Exception as e:
@@ -501,9 +846,7 @@ def launch_game():
 @app.route('/api/browse', methods=['GET'])
 def browse_files():
     try:
-        root = tk.Tk(); root.withdraw(); root.attributes('-topmost', True)
-        filepath = filedialog.askopenfilename(title="Select Game Executable", filetypes=[("Executables", "*.exe"), ("All files", "*.*")])
-        root.destroy()
+        filepath = file_dialogs.ask_open_filename(title="Select Game Executable", filetypes=[("Executables", "*.exe"), ("All files", "*.*")])
         return jsonify({"status": "success", "path": filepath}) if filepath else jsonify({"status": "cancelled", "path": ""})
     except Exception as e: return jsonify({"status": "error", "message": str(e)})
 
@@ -513,7 +856,7 @@ def serve_assets(filename): return send_from_directory('assets', filename)
 @app.route('/api/check_for_updates')
 def check_for_updates():
     try:
-        response = requests.get(f"https://api.github.com/repos/{GITHUB_REPO}/releases/latest", timeout=5, headers={'User-Agent': 'GameHub'})
+        response = _github_session.get(f"https://api.github.com/repos/{GITHUB_REPO}/releases/latest", timeout=5)
         if response.ok:
             data = response.json()
             latest = data.get("tag_name", "").lstrip("v")
@@ -547,48 +890,47 @@ def perform_update():
         try:
             dl_dir = os.path.join(os.path.expanduser("~"), "Downloads")
             setup_path = os.path.join(dl_dir, "GameHub_Update.exe")
-            sig_path = os.path.join(dl_dir, "GameHub_Update.exe.sig")
 
             # 1. Download Executable
             socketio.emit('update_progress', {'status': 'Downloading Update...', 'percent': 10})
-            with requests.get(download_url, stream=True, headers={'User-Agent': 'GameHub'}) as r:
+            with _github_session.get(download_url, stream=True, timeout=UPDATE_TIMEOUT) as r:
                 r.raise_for_status()
                 total = int(r.headers.get('content-length', 0))
                 dl = 0
+                last_step = -1
+                # Hash while downloading so the installer never has to be read back for verification
+                exe_hash = hashlib.sha256()
                 with open(setup_path, 'wb') as f:
-                    for chunk in r.iter_content(8192):
+                    for chunk in r.iter_content(UPDATE_CHUNK_SIZE):
                         dl += len(chunk)
+                        exe_hash.update(chunk)
                         f.write(chunk)
-                        if total and (int(100*dl/total) % 10 == 0): 
-                            socketio.emit('update_progress', {'status': 'downloading', 'percent': int(100*dl/total)})
+                        # Only report when the download crosses into a new 5% step (big chunks can skip exact multiples)
+                        pct = int(100*dl/total) if total else 0
+                        if total and pct // 5 != last_step:
+                            last_step = pct // 5
+                            socketio.emit('update_progress', {'status': 'downloading', 'percent': pct})
 
             # 2. Download Signature
             socketio.emit('update_progress', {'status': 'Verifying Security...', 'percent': 90})
-            with requests.get(sig_url, headers={'User-Agent': 'GameHub'}) as r:
+            with _github_session.get(sig_url, timeout=UPDATE_TIMEOUT) as r:
                 if not r.ok:
                     raise Exception("Security signature file missing. Update aborted.")
-                with open(sig_path, 'wb') as f:
-                    f.write(r.content)
+                sig_data = r.content
 
             # 3. VERIFY SIGNATURE
             try:
                 public_key = serialization.load_pem_public_key(APP_PUBLIC_KEY)
-                
-                with open(setup_path, 'rb') as f:
-                    exe_data = f.read()
-                with open(sig_path, 'rb') as f:
-                    sig_data = f.read()
 
                 public_key.verify(
                     sig_data,
-                    exe_data,
+                    exe_hash.digest(),
                     padding.PSS(mgf=padding.MGF1(hashes.SHA256()), salt_length=padding.PSS.MAX_LENGTH),
-                    hashes.SHA256()
+                    Prehashed(hashes.SHA256())
                 )
                 logging.info("Update signature verified successfully.")
             except InvalidSignature:
                 if os.path.exists(setup_path): os.remove(setup_path)
-                if os.path.exists(sig_path): os.remove(sig_path)
                 raise Exception("SECURITY ALERT: The update file is invalid or has been tampered with.")
             except Exception as e:
                 raise Exception(f"Verification Error: {e}")
@@ -605,7 +947,7 @@ def perform_update():
             logging.error(f"Update failed: {e}")
             socketio.emit('update_error', {'message': str(e)})
 
-    threading.Thread(target=do_update).start()
+    run_in_background(do_update)
     return jsonify({"status": "success", "message": "Update started"})
 
 # --- NEW ROUTES FOR FOLDER & DELETE ---
@@ -639,83 +981,103 @@ def remove_manual_game():
 
     try:
         # 1. Remove from manual_games.json
-        if os.path.exists(MANUAL_GAMES_FILE):
-            with open(MANUAL_GAMES_FILE, 'r') as f:
-                manual_games = json.load(f)
-            
+        with _manual_games_lock:
+            manual_games = load_manual_games()
             if name in manual_games:
                 del manual_games[name]
-                
-                with open(MANUAL_GAMES_FILE, 'w') as f:
-                    json.dump(manual_games, f, indent=4)
+                save_manual_games(manual_games)
                     
         # 2. Remove from Database
         conn = get_db_connection()
-        cursor = conn.cursor()
         # Source is usually 'Other Games' for manual entries
-        cursor.execute("DELETE FROM games WHERE name = ? AND source = 'Other Games'", (name,))
-        conn.commit()
-        conn.close()
+        with _db_lock, conn:
+            conn.execute(_SQL_DELETE_MANUAL_GAME, (name,))
 
-        # 3. Update local list
-        global all_games
-        all_games = [g for g in all_games if not (g.name == name and g.source == 'Other Games')]
+        # 3. Update local list (index lookup instead of rebuilding the list and index)
+        with _library_lock:
+            game = _games_by_key.pop((name, 'Other Games'), None)
+            if game is not None:
+                all_games.remove(game)
+                touch_library()
         
         return jsonify({"status": "success"})
     except Exception as e:
         return jsonify({"status": "error", "message": str(e)}), 500
 
 # --- NEW SYSTEM STATS ROUTE ---
+PING_HOST = ("8.8.8.8", 53) # Google DNS
+PING_CACHE_SECONDS = 2.0
+_ping_cache = {'t': float('-inf'), 'value': "999"}
+# Matches "time=24ms", "time=24.3 ms" and "time<1ms" straight from ping's raw stdout
+_PING_TIME_RE = re.compile(rb"time[=<]\s*([\d.]+)\s*ms")
+
+# The UI polls this endpoint; serve repeated polls from a short-lived snapshot
+STATS_CACHE_SECONDS = 1.0
+_stats_cache = {'t': float('-inf'), 'value': None}
+_stats_lock = threading.Lock()
+
+def _ping_subprocess():
+    """Fallback for networks that block outbound TCP/53: one ICMP echo via the system ping."""
+    # Windows uses -n, Linux/Mac uses -c
+    param = "-n" if platform.system().lower() == "windows" else "-c"
+    
+    # Flag creation is needed to hide the console window popup on Windows
+    startupinfo = None
+    if platform.system().lower() == "windows":
+        startupinfo = subprocess.STARTUPINFO()
+        startupinfo.dwFlags |= subprocess.STARTF_USESHOWWINDOW
+
+    result = subprocess.run(
+        ["ping", param, "1", PING_HOST[0]], 
+        stdout=subprocess.PIPE, 
+        stderr=subprocess.PIPE, 
+        startupinfo=startupinfo # Hide the popup window
+    )
+    m = _PING_TIME_RE.search(result.stdout)
+    return m.group(1).decode() if m else "999"
+
+def _measure_ping():
+    """Round trip to PING_HOST in ms (as a string), timed from a TCP connect and cached briefly."""
+    now = time.monotonic()
+    if now - _ping_cache['t'] < PING_CACHE_SECONDS:
+        return _ping_cache['value']
+    
+    try:
+        t0 = time.perf_counter_ns()
+        with socket.create_connection(PING_HOST, timeout=2):
+            pass
+        ping_ms = str(max(1, round((time.perf_counter_ns() - t0) / 1_000_000)))
+    except OSError:
+        ping_ms = _ping_subprocess()
+    
+    _ping_cache['t'] = now
+    _ping_cache['value'] = ping_ms
+    return ping_ms
+
 @app.route('/api/system_stats')
 def get_system_stats():
     try:
-        # 1. Get CPU (FIX: Add interval=0.1 to allow measurement time)
-        cpu = psutil.cpu_percent(interval=0.1)
-        
-        # 2. Get RAM
-        ram = psutil.virtual_memory().percent
-        
-        # 3. Measure Ping (to Google DNS)
-        import subprocess
-        import platform
-        
-        host = "8.8.8.8"
-        # Windows uses -n, Linux/Mac uses -c
-        param = "-n" if platform.system().lower() == "windows" else "-c"
-        
-        # Flag creation is needed to hide the console window popup on Windows
-        startupinfo = None
-        if platform.system().lower() == "windows":
-            startupinfo = subprocess.STARTUPINFO()
-            startupinfo.dwFlags |= subprocess.STARTF_USESHOWWINDOW
-
-        command = ["ping", param, "1", host]
-        
-        result = subprocess.run(
-            command, 
-            stdout=subprocess.PIPE, 
-            stderr=subprocess.PIPE, 
-            startupinfo=startupinfo # Hide the popup window
-        )
-        output = result.stdout.decode()
-        
-        ping_ms = "999"
-        
-        # Parsing Logic
-        if "time<" in output: 
-            ping_ms = "1" # Very fast connection (<1ms)
-        elif "time=" in output:
-            try:
-                # Extracts "24" from "time=24ms"
-                ping_ms = output.split("time=")[1].split("ms")[0].strip()
-            except: 
-                pass
+        with _stats_lock:
+            now = time.monotonic()
+            if now - _stats_cache['t'] >= STATS_CACHE_SECONDS:
+                # 1. Get CPU (non-blocking: usage since the previous call, primed at startup)
+                cpu = psutil.cpu_percent(interval=None)
+                
+                # 2. Get RAM
+                ram = psutil.virtual_memory().percent
+                
+                # 3. Measure Ping (to Google DNS)
+                ping_ms = _measure_ping()
+                
+                _stats_cache['value'] = {
+                    "cpu": cpu,
+                    "ram": ram,
+                    "ping": ping_ms
+                }
+                _stats_cache['t'] = now
+            stats = _stats_cache['value']
             
-        return jsonify({
-            "cpu": cpu,
-            "ram": ram,
-            "ping": ping_ms
-        })
+        return jsonify(stats)
     except Exception as e:
         print(f"Stats Error: {e}")
         return jsonify({"cpu": 0, "ram": 0, "ping": "Err"})
@@ -733,6 +1095,9 @@ if __name__ == '__main__':
     migrate_json_to_db()
     load_games_from_db()
     
+    # Prime psutil so the first /api/system_stats call has a CPU baseline
+    psutil.cpu_percent(interval=None)
+    
     # Start File Watcher
     if start_watcher:
         start_watcher(socketio, load_config())
@@ -740,7 +1105,7 @@ if __name__ == '__main__':
     # Initial Scan if needed
     if len(all_games) == 0:
         logging.info("Library empty. Starting Auto-Scan...")
-        threading.Thread(target=scan_library_background).start()
+        request_library_scan()
     
     print("--- STARTING GAME HUB ---")
     
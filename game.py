@@ -3,9 +3,9 @@ import os
 import json
 from typing import Optional, Union
 # *** FIX: Import 'fields' (plural) ***
-from dataclasses import dataclass, field, fields, asdict
+from dataclasses import dataclass, field, fields
 
-@dataclass
+@dataclass(slots=True)
 class Game:
     name: str
     source: str
@@ -22,8 +22,17 @@ class Game:
     # --- Metadata ---
     grid_image_url: Optional[str] = None
 
+    # --- Performance Data ---
+    avg_fps: str = ""
+    best_ping: str = ""
+
+    # Derived from source/name in __post_init__; a slot because slotted classes can't use cached_property
+    unique_id: str = field(init=False, repr=False, compare=False)
+
     def __post_init__(self):
         self.name = self.name.strip()
+        # Computed once: name/source are fixed after construction, and this is hit per row on every save
+        self.unique_id = f"{self.source}|{self.name}"
 
     def get_launch_command(self) -> Optional[str]:
         if self.source == 'Steam': return f"steam://run/{self.launch_id}"
@@ -37,15 +46,26 @@ class Game:
         return None
     
     def to_dict(self) -> dict:
-        return asdict(self)
+        # Built directly from the slots: asdict() deep-copies every value, which flat data doesn't need
+        return {
+            'name': self.name,
+            'source': self.source,
+            'launch_id': self.launch_id,
+            'install_path': self.install_path,
+            'executable_name': self.executable_name,
+            'favorite': self.favorite,
+            'hidden': self.hidden,
+            'last_played': self.last_played,
+            'playtime_seconds': self.playtime_seconds,
+            'grid_image_url': self.grid_image_url,
+            'avg_fps': self.avg_fps,
+            'best_ping': self.best_ping,
+        }
     
     @staticmethod
     def from_dict(data: dict) -> 'Game':
-        # *** FIX: Use 'fields()' (plural) instead of 'field()' ***
-        class_fields = {f.name for f in fields(Game)}
-        filtered_data = {k: v for k, v in data.items() if k in class_fields}
+        filtered_data = {k: data[k] for k in data.keys() & _FIELD_NAME_SET}
         return Game(**filtered_data)
 
-    @property
-    def unique_id(self) -> str:
-        return f"{self.source}|{self.name}"
\ No newline at end of file
+# Computed once at import instead of walking fields() per call; only fields the constructor accepts
+_FIELD_NAME_SET = frozenset(f.name for f in fields(Game) if f.init)
\ No newline at end of file
@@ -1,40 +1,71 @@
 # game_scanner.py
 import os
+import re
 import winreg
 import json
 import vdf
 import logging
 from typing import List, Dict
-from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from game import Game
 
+# Created once and reused by every scan instead of spinning up workers per scan.
+# The sources are registry/disk bound, so more workers than cores is fine.
+_scan_pool = ThreadPoolExecutor(max_workers=8, thread_name_prefix='scan')
+# Steam libraries get their own workers: _find_steam_games itself runs on _scan_pool,
+# and waiting there on work queued behind it could stall the scan
+_library_pool = ThreadPoolExecutor(max_workers=4, thread_name_prefix='steamlib')
+
+# Always read the 64-bit registry view, even from a 32-bit interpreter
+_REG_READ = winreg.KEY_READ | winreg.KEY_WOW64_64KEY
+
+# The three AppState fields we use, read straight out of an appmanifest_*.acf (one "key"<tab>"value" per line)
+_ACF_KEYS = ('appid', 'name', 'installdir')
+_ACF_RE = re.compile(r'^\s*"(appid|name|installdir)"[ \t]+"((?:[^"\\\n]|\\.)*)"', re.M)
+
 class GameScanner:
+    def __init__(self):
+        # Folders already proven large enough; the scanner lives for the whole session
+        self._valid_folders = set()
+
     def find_all_games(self, config: Dict) -> List[Game]:
         games = []
         logging.info("--- STARTING GAME SCAN ---")
         
-        with ThreadPoolExecutor(max_workers=4) as executor:
-            future_steam = executor.submit(self._find_steam_games, config)
-            future_epic = executor.submit(self._find_epic_games)
-            future_ea = executor.submit(self._find_ea_games)
-            future_manual = executor.submit(self._load_manual_games)
-            
-            try: games.extend(future_steam.result())
-            except: pass
-            try: games.extend(future_epic.result())
-            except: pass
-            try: games.extend(future_ea.result())
-            except: pass
-            try: games.extend(future_manual.result())
-            except: pass
+        # The two EA halves run side by side and are matched once both are in
+        futures = {
+            _scan_pool.submit(self._find_steam_games, config): 'steam',
+            _scan_pool.submit(self._find_epic_games): 'epic',
+            _scan_pool.submit(self._build_uninstall_map): 'ea_uninstall',
+            _scan_pool.submit(self._read_ea_entries): 'ea_registry',
+            _scan_pool.submit(self._load_manual_games): 'manual',
+        }
+        ea_parts = {}
+        
+        # Collect in completion order so a slow source doesn't hold up the rest
+        for future in as_completed(futures):
+            source = futures[future]
+            try: result = future.result()
+            except Exception as e:
+                logging.error(f"{source} scan failed: {e}")
+                continue
+            if source.startswith('ea_'): ea_parts[source] = result
+            else: games.extend(result)
+        
+        if len(ea_parts) == 2:
+            try: games.extend(self._match_ea_games(ea_parts['ea_uninstall'], ea_parts['ea_registry']))
+            except Exception as e: logging.error(f"ea scan failed: {e}")
             
         logging.info(f"--- SCAN COMPLETE. Found {len(games)} games. ---")
         return games
 
     # --- HELPER 1: Normalize Names ---
+    # Characters dropped by _clean_name, applied in a single translate() pass
+    _CLEAN_TABLE = str.maketrans('', '', "™®: ")
+
     def _clean_name(self, name):
         # Removes spaces and symbols to match "Need for Speed™ Unbound" with "Need for Speed Unbound"
-        return name.lower().replace("™", "").replace("®", "").replace(":", "").replace(" ", "").strip()
+        return name.lower().translate(self._CLEAN_TABLE).strip()
 
     # --- HELPER 2: Check Physical Folder Size ---
     def _is_valid_game_folder(self, folder_path):
@@ -42,46 +73,70 @@ class GameScanner:
         if not folder_path or not os.path.exists(folder_path):
             return False
         
+        key = os.path.normcase(os.path.normpath(folder_path))
+        if key in self._valid_folders:
+            return True
+        
         total_size = 0
         # 50 MB Threshold (Filters out empty/junk folders)
         threshold = 50 * 1024 * 1024 
         
-        try:
-            for root, dirs, files in os.walk(folder_path):
-                if "__installer" in root.lower(): continue # Skip installer backups
-                
-                for f in files:
-                    fp = os.path.join(root, f)
-                    total_size += os.path.getsize(fp)
-                    
-                    if total_size > threshold:
-                        return True
-        except: pass
+        # Iterative scandir walk: DirEntry carries the file size on Windows, so no extra stat per file
+        stack = [folder_path]
+        while stack:
+            try:
+                with os.scandir(stack.pop()) as it:
+                    for entry in it:
+                        if entry.is_dir(follow_symlinks=False):
+                            if "__installer" not in entry.name.lower(): # Skip installer backups
+                                stack.append(entry.path)
+                            continue
+                        
+                        total_size += entry.stat(follow_symlinks=False).st_size
+                        if total_size > threshold:
+                            self._valid_folders.add(key)
+                            return True
+            except OSError: continue # Unreadable directory: skip it, like os.walk
         return False
 
     # --- HELPER 3: Check Start Menu ---
-    def _has_start_menu_shortcut(self, game_name):
-        paths = [
-            os.path.join(os.getenv('ProgramData'), r'Microsoft\Windows\Start Menu\Programs'),
-            os.path.join(os.getenv('APPDATA'), r'Microsoft\Windows\Start Menu\Programs')
+    def _build_shortcut_index(self):
+        """Cleaned names of every .lnk in the machine and user Start Menus, collected in one walk."""
+        names = set()
+        stack = [
+            os.path.join(base, r'Microsoft\Windows\Start Menu\Programs')
+            for base in (os.getenv('ProgramData'), os.getenv('APPDATA')) if base
         ]
-        
+        while stack:
+            try:
+                with os.scandir(stack.pop()) as it:
+                    for entry in it:
+                        if entry.is_dir(follow_symlinks=False):
+                            stack.append(entry.path)
+                        elif entry.name.lower().endswith(".lnk"):
+                            sc_name = self._clean_name(entry.name[:-4])
+                            if sc_name: names.add(sc_name)
+            except OSError: continue
+        return names
+
+    def _has_start_menu_shortcut(self, game_name, shortcut_names):
         target = self._clean_name(game_name)
-        
-        for path in paths:
-            if not os.path.exists(path): continue
-            for root, dirs, files in os.walk(path):
-                for f in files:
-                    if f.lower().endswith(".lnk"):
-                        sc_name = self._clean_name(f.replace(".lnk", ""))
-                        # Check for partial match (e.g. "skate" in "skate.lnk")
-                        if target in sc_name or sc_name in target:
-                            return True
-        return False
+        if target in shortcut_names:
+            return True
+        # Check for partial match (e.g. "skate" in "skate.lnk")
+        return any(target in sc_name or sc_name in target for sc_name in shortcut_names)
 
-    def _find_ea_games(self) -> List[Game]:
-        games = []
-        
+    # --- HELPER 4: Read Registry Values ---
+    def _read_vals(self, parent, sub, names):
+        """Opens parent\\sub once and returns {name: value} for the values that exist."""
+        vals = {}
+        with winreg.OpenKey(parent, sub, 0, _REG_READ) as skey:
+            for value_name in names:
+                try: vals[value_name] = winreg.QueryValueEx(skey, value_name)[0]
+                except FileNotFoundError: pass
+        return vals
+
+    def _build_uninstall_map(self) -> Dict[str, str]:
         # 1. Build Uninstall Map { CleanName : Path }
         # This gets the paths for F1 24, NFS, etc.
         uninstall_map = {}
@@ -91,26 +146,24 @@ class GameScanner:
         ]
         
         for reg_path in uninstall_keys:
+            try: key = winreg.OpenKey(winreg.HKEY_LOCAL_MACHINE, reg_path, 0, _REG_READ)
+            except OSError: continue
             try:
-                key = winreg.OpenKey(winreg.HKEY_LOCAL_MACHINE, reg_path)
-                i = 0
-                while True:
-                    try:
-                        sub = winreg.EnumKey(key, i)
-                        skey = winreg.OpenKey(key, sub)
-                        try:
-                            name = winreg.QueryValueEx(skey, "DisplayName")[0]
-                            path = winreg.QueryValueEx(skey, "InstallLocation")[0]
-                            if name and path:
-                                uninstall_map[self._clean_name(name)] = path
-                        except: pass
-                        finally: winreg.CloseKey(skey)
-                        i += 1
-                    except OSError: break
-                winreg.CloseKey(key)
-            except: pass
+                # Bounded by the subkey count instead of enumerating until EnumKey raises
+                for i in range(winreg.QueryInfoKey(key)[0]):
+                    try: vals = self._read_vals(key, winreg.EnumKey(key, i), ("DisplayName", "InstallLocation"))
+                    except OSError: continue
+                    name = vals.get("DisplayName")
+                    path = vals.get("InstallLocation")
+                    if isinstance(name, str) and name and path:
+                        uninstall_map[self._clean_name(name)] = path
+            except OSError: pass
+            finally: winreg.CloseKey(key)
+        return uninstall_map
 
-        # 2. Scan EA Registry (To get the Launch IDs)
+    def _read_ea_entries(self):
+        # 2. Scan EA Registry (To get the Launch IDs) -> [(launch_id, name)]
+        entries = []
         ea_reg_paths = [
             r"SOFTWARE\WOW6432Node\Origin Games",
             r"SOFTWARE\Electronic Arts\EA Games",
@@ -118,84 +171,106 @@ class GameScanner:
         ]
 
         for reg_path in ea_reg_paths:
+            try: hkey = winreg.OpenKey(winreg.HKEY_LOCAL_MACHINE, reg_path, 0, _REG_READ)
+            except OSError: continue
             try:
-                hkey = winreg.OpenKey(winreg.HKEY_LOCAL_MACHINE, reg_path)
-                index = 0
-                while True:
+                for index in range(winreg.QueryInfoKey(hkey)[0]):
                     try:
                         launch_id = winreg.EnumKey(hkey, index)
-                        game_key = winreg.OpenKey(hkey, launch_id)
-                        try:
-                            name = winreg.QueryValueEx(game_key, "DisplayName")[0]
-                            clean_name = self._clean_name(name)
-                            
-                            should_add = False
-                            install_path = "Unknown"
-
-                            # CHECK A: Is it in the Windows Uninstall List? (Ghosts are here)
-                            if clean_name in uninstall_map:
-                                path = uninstall_map[clean_name]
-                                
-                                # VERIFY THE FOLDER SIZE
-                                if self._is_valid_game_folder(path):
-                                    should_add = True
-                                    install_path = path
-                                else:
-                                    # Found path, but folder is empty/missing. It's a Ghost.
-                                    should_add = False 
-
-                            # CHECK B: Not in Uninstall List (Skate is here)
-                            else:
-                                # Since we have no path to check, we fallback to Start Menu
-                                if self._has_start_menu_shortcut(name):
-                                    should_add = True
-                                    install_path = "Unknown"
-
-                            if name and should_add:
-                                games.append(Game(name, 'EA', launch_id, install_path))
-                                
-                        except: pass
-                        finally: winreg.CloseKey(game_key)
-                        index += 1
-                    except OSError: break 
-                winreg.CloseKey(hkey)
+                        name = self._read_vals(hkey, launch_id, ("DisplayName",)).get("DisplayName")
+                    except OSError: continue
+                    if name: entries.append((launch_id, name))
+            except OSError: pass
+            finally: winreg.CloseKey(hkey)
+        return entries
+
+    def _match_ea_games(self, uninstall_map, entries) -> List[Game]:
+        games = []
+        shortcut_names = None # Built on first use, once per scan
+
+        for launch_id, name in entries:
+            try:
+                clean_name = self._clean_name(name)
+                
+                should_add = False
+                install_path = "Unknown"
+
+                # CHECK A: Is it in the Windows Uninstall List? (Ghosts are here)
+                if clean_name in uninstall_map:
+                    path = uninstall_map[clean_name]
+                    
+                    # VERIFY THE FOLDER SIZE
+                    if self._is_valid_game_folder(path):
+                        should_add = True
+                        install_path = path
+                    else:
+                        # Found path, but folder is empty/missing. It's a Ghost.
+                        should_add = False 
+
+                # CHECK B: Not in Uninstall List (Skate is here)
+                else:
+                    # Since we have no path to check, we fallback to Start Menu
+                    if shortcut_names is None:
+                        shortcut_names = self._build_shortcut_index()
+                    if self._has_start_menu_shortcut(name, shortcut_names):
+                        should_add = True
+                        install_path = "Unknown"
+
+                if name and should_add:
+                    games.append(Game(name, 'EA', launch_id, install_path))
+                    
             except: pass
             
         return games
 
+    # --- HELPER 5: Read Steam Manifests ---
+    def _read_acf(self, file_path):
+        """Returns the appid/name/installdir of a Steam app manifest without parsing the whole file."""
+        with open(file_path, 'r', encoding='utf-8', errors='replace') as f:
+            text = f.read()
+        m = {}
+        for match in _ACF_RE.finditer(text):
+            m.setdefault(match.group(1), match.group(2)) # first hit is the top-level AppState key
+            if len(m) == len(_ACF_KEYS): break
+        # Escaped characters or an unusual layout: let vdf do the full parse
+        if len(m) < len(_ACF_KEYS) or any('\\' in v for v in m.values()):
+            m = vdf.loads(text).get('AppState', {})
+        return m
+
     def _find_steam_games(self, config: Dict) -> List[Game]:
-        games = []
+        paths = set()
         try:
             hkey = winreg.OpenKey(winreg.HKEY_LOCAL_MACHINE, r"SOFTWARE\WOW6432Node\Valve\Steam")
             steam_path = winreg.QueryValueEx(hkey, "InstallPath")[0]
             winreg.CloseKey(hkey)
-            paths = {os.path.join(steam_path, "steamapps")}
+            paths.add(os.path.normpath(os.path.join(steam_path, "steamapps")))
             lib_vdf = os.path.join(steam_path, "steamapps", "libraryfolders.vdf")
             if os.path.exists(lib_vdf):
                 with open(lib_vdf, 'r', encoding='utf-8') as f:
                     data = vdf.load(f)
                     for k, v in data.get('libraryfolders', {}).items():
-                        if isinstance(v, dict) and 'path' in v: paths.add(os.path.join(v['path'], 'steamapps'))
-            for path in paths:
-                if not os.path.exists(path): continue
-                for f in os.listdir(path):
-                    if f.startswith("appmanifest_") and f.endswith(".acf"):
-                        try:
-                            with open(os.path.join(path, f), 'r', encoding='utf-8') as file:
-                                m = vdf.load(file).get('AppState', {})
-                                if m.get('name'): games.append(Game(m.get('name'), 'Steam', m.get('appid'), os.path.join(path, 'common', m.get('installdir', ''))))
-                        except: pass
+                        if isinstance(v, dict) and 'path' in v: paths.add(os.path.normpath(os.path.join(v['path'], 'steamapps')))
         except: pass
+        # Extra steamapps folders added by the user
         for path in config.get('scan_paths', []):
-             if os.path.isdir(path):
-                if os.path.basename(path) == 'steamapps': 
+            if os.path.basename(path) == 'steamapps': paths.add(os.path.normpath(path))
+        
+        # Libraries usually sit on different drives, so they are read side by side
+        games = []
+        for library in _library_pool.map(self._scan_steamapps, paths):
+            games.extend(library)
+        return games
+    
+    def _scan_steamapps(self, path) -> List[Game]:
+        games = []
+        try:
+            for f in os.listdir(path):
+                if f.startswith("appmanifest_") and f.endswith(".acf"):
                     try:
-                        for f in os.listdir(path):
-                            if f.startswith("appmanifest_") and f.endswith(".acf"):
-                                with open(os.path.join(path, f), 'r', encoding='utf-8') as file:
-                                    m = vdf.load(file).get('AppState', {})
-                                    if m.get('name'): games.append(Game(m.get('name'), 'Steam', m.get('appid'), os.path.join(path, 'common', m.get('installdir', ''))))
+                        m = self._read_acf(os.path.join(path, f))
+                        if m.get('name'): games.append(Game(m.get('name'), 'Steam', m.get('appid'), os.path.join(path, 'common', m.get('installdir', ''))))
                     except: pass
+        except OSError: pass
         return games
     
     def _find_epic_games(self) -> List[Game]:
@@ -218,7 +293,7 @@ class GameScanner:
         try:
             path = os.path.join(os.getenv('LOCALAPPDATA'), 'Game Hub', 'manual_games.json')
             if os.path.exists(path):
-                with open(path, 'r') as f:
+                with open(path, 'r', encoding='utf-8') as f:
                     for n, p in json.load(f).items():
                         if os.path.exists(p): games.append(Game(n, 'Other Games', None, p))
         except: pass
@@ -19,12 +19,16 @@ window.addEventListener('DOMContentLoaded', async () => {
         refreshLibrary(false, true); 
     });
 
-    // 3. APP EVENT: Scan Finished -> Just Update UI (Stops the Loop)
-    socket.on('scan_complete', (msg) => {
-        console.log('Scan complete. Updating UI only...');
-        fetchGamesAndRender(); 
+    // 3. APP EVENT: Scan Finished -> Patch only what changed (Stops the Loop)
+    socket.on('scan_delta', (delta) => {
+        console.log(`Scan complete: +${delta.added.length} -${delta.removed.length} ~${delta.updated.length}`);
+        applyScanDelta(delta);
+        renderLibrary();
     });
 
+    // 3b. Covers fetched in the background -> Patch just those cards
+    socket.on('covers_delta', (covers) => applyCoverUpdates(covers));
+
     // 4. Single Game Update (Playtime, Favorites)
     socket.on('game_updated', (updatedGame) => {
         const idx = allGames.findIndex(g => g.name === updatedGame.name && g.source === updatedGame.source);
@@ -116,7 +120,7 @@ async function refreshLibrary(isInitialLoad = false, isAutoRefresh = false) {
     // Tell backend to start scanning threads
     await fetch('/api/refresh', { method: 'POST' });
     // Note: We do NOT wait for the scan to finish here. 
-    // We wait for the 'scan_complete' socket event.
+    // We wait for the 'scan_delta' socket event.
 }
 
 // ONLY fetches data and updates screen (GET)
@@ -124,6 +128,49 @@ async function fetchGamesAndRender() {
     try {
         const response = await fetch('/api/games');
         allGames = await response.json();
+        renderLibrary();
+    } catch (e) {
+        console.error("UI Update failed:", e);
+    }
+}
+
+// Patches allGames with the differences reported by a background scan
+function applyScanDelta(delta) {
+    const gameKey = g => `${g.source}|${g.name}`;
+    const removed = new Set(delta.removed.map(gameKey));
+    // Added games are upserted: the list may already hold them if it was fetched mid-scan
+    const changed = new Map(delta.updated.concat(delta.added).map(g => [gameKey(g), g]));
+    
+    allGames = allGames
+        .filter(g => !removed.has(gameKey(g)))
+        .map(g => {
+            const key = gameKey(g);
+            const fresh = changed.get(key);
+            changed.delete(key);
+            return fresh || g;
+        })
+        .concat(Array.from(changed.values()));
+}
+
+// Swaps in newly fetched covers without redrawing the library
+function applyCoverUpdates(covers) {
+    const gamesById = new Map(allGames.map(g => [`${g.source}|${g.name}`, g]));
+    
+    for (const cover of covers) {
+        const game = gamesById.get(cover.id);
+        if (!game) continue;
+        game.grid_image_url = cover.url;
+        
+        const gridItem = document.querySelector(`#grid-view .grid-item[data-id="${CSS.escape(cover.id)}"]`);
+        if (gridItem && cover.url && cover.url !== "MISSING") {
+            gridItem.innerHTML = `<img src="${cover.url}" alt="${game.name}" loading="lazy">`;
+        }
+    }
+}
+
+// Redraws the sidebar and current view from allGames
+function renderLibrary() {
+    try {
         populateLibraries();
         
         // Restore active library tab
@@ -248,6 +295,7 @@ function displayCurrentView() {
         // Grid Item
         const gridItem = document.createElement('div'); 
         gridItem.className = 'grid-item';
+        gridItem.dataset.id = `${game.source}|${game.name}`;
         const hasImage = game.grid_image_url && game.grid_image_url !== "MISSING";
         
         gridItem.innerHTML = hasImage 
@@ -2,108 +2,302 @@
 import time
 import logging
 import os
-import winreg
-from watchdog.observers import Observer
-from watchdog.events import FileSystemEventHandler
+import re
+import stat
+import queue
+import ctypes
+import threading
+# winreg and watchdog are imported where they're used, so importing this module stays cheap
+# and works on machines without them
+
+DRIVE_REMOTE = 4 # GetDriveTypeW result for mapped network drives
+NETWORK_POLL_SECONDS = 10 # each poll re-lists the whole tree, so keep it slow
+_LIBRARY_PATH_RE = re.compile(r'"path"\s+"((?:[^"\\]|\\.)*)"') # "path" entries in libraryfolders.vdf
+
+class GameLibraryEventHandler:
+    # Observers only ever call dispatch(), which this class implements itself, so there's
+    # no need to import watchdog's FileSystemEventHandler just to subclass it.
+
+    _SEP = os.sep
+    _HANDLED_TYPES = frozenset({'created', 'modified', 'moved', 'deleted'})
+
+    # Whitelist, checked once per event
+    _WATCHED_SUFFIXES = (".acf", ".item")
+    _WATCHED_NAMES = frozenset({"installerdata.xml", "manual_games.json"})
 
-class GameLibraryEventHandler(FileSystemEventHandler):
     def __init__(self, socketio):
         self.socketio = socketio
-        self.last_event_time = 0
-        self.debounce_period = 2 # seconds
+        # Debounce: the first change refreshes right away, the rest of the burst is coalesced
+        # into one trailing refresh once things go quiet (or the max latency passes, whichever is first)
+        # Kept as integer nanoseconds against time.monotonic_ns(): no float math per event, and
+        # wall-clock jumps (NTP, DST) can't wedge the window open or shut
+        self.quiet_period_ns = 500_000_000 # 0.5 s
+        self.max_latency_ns = 2 * 1_000_000_000 # 2 s
+        self._lock = threading.Lock()
+        self._timer = None # open debounce window while set
+        self._window_start = 0
+        self._missed = False # changes seen since the last emit
+        # Atomic saves show up as DELETE then CREATE of the same file; deletes are held this
+        # long so the pair collapses into one change instead of a refresh with the file missing
+        self.rename_window_ns = 200_000_000 # 0.2 s
+        self._pending_deletes = {} # src_path -> Timer
+        self._replaced = {} # src_path -> monotonic_ns when its DELETE + CREATE was coalesced
+        # Socket.IO emits happen on their own thread so a slow client never stalls event draining
+        self._emit_queue = queue.Queue(maxsize=16)
+        threading.Thread(target=self._emit_loop, daemon=True, name='watcher-emit').start()
         logging.info("File watcher started.")
 
-    def on_any_event(self, event):
-        # 1. Ignore directory changes immediately
-        if event.is_directory:
+    def dispatch(self, event):
+        # Filter as early as possible: almost every event in a watched library is for a
+        # file we don't care about.
+        
+        # 1. Ignore directory changes and event types that never change a file's contents
+        #    (newer watchdog versions also report opened/closed on some platforms)
+        if event.is_directory or event.event_type not in self._HANDLED_TYPES:
             return
 
-        filename = os.path.basename(event.src_path)
+        # A rename lands on its destination (e.g. manual_games.json.tmp -> manual_games.json)
+        path = event.dest_path if event.event_type == 'moved' else event.src_path
+        # Event paths are always root + os.sep + name, so one rpartition is all basename() would do
+        filename = path.rpartition(self._SEP)[2]
         
         # 2. STRICT WHITELIST
         # We ONLY care about these specific files. 
         # If it's not one of these, we stop immediately.
-        is_game_file = False
-        
-        # Steam Manifests
-        if filename.startswith("appmanifest_") and filename.endswith(".acf"):
-            is_game_file = True
-        # Epic Games Manifests
-        elif filename.endswith(".item"):
-            is_game_file = True
-        # EA Games Data
-        elif filename == "installerdata.xml":
-            is_game_file = True
-        # Our Manual Games File
-        elif filename == "manual_games.json":
-            is_game_file = True
+        # One endswith() against a tuple rejects almost everything before any further checks.
+        if filename.endswith(self._WATCHED_SUFFIXES):
+            # Epic Games Manifests (.item) / Steam Manifests (appmanifest_*.acf)
+            is_game_file = filename.endswith(".item") or filename.startswith("appmanifest_")
+        else:
+            # EA Games Data / Our Manual Games File
+            is_game_file = filename in self._WATCHED_NAMES
             
         if not is_game_file:
             # This ignores app_error.log, game_cache.json, config.json, etc.
             return
 
-        # 3. Debounce (Prevent double-firing)
-        current_time = time.time()
-        if current_time - self.last_event_time < self.debounce_period:
+        # 3. Coalesce DELETE + CREATE (+ the MODIFY that usually trails it) into a single change.
+        #    On Windows os.replace() shows up as DELETE of the target then MOVE onto it, so a
+        #    rename landing on the path cancels the delete the same way a CREATE does.
+        if event.event_type == 'deleted':
+            timer = threading.Timer(self.rename_window_ns / 1e9, self._confirm_delete, (event, filename))
+            timer.daemon = True
+            with self._lock:
+                self._pending_deletes[path] = timer
+            timer.start()
             return
+        if event.event_type in ('created', 'moved'):
+            with self._lock:
+                timer = self._pending_deletes.pop(path, None)
+                if timer is not None:
+                    self._replaced[path] = time.monotonic_ns()
+            if timer is not None:
+                timer.cancel() # file was replaced, not removed
+        elif event.event_type == 'modified' and self._replaced:
+            with self._lock:
+                replaced_at = self._replaced.pop(path, None)
+            if replaced_at is not None and time.monotonic_ns() - replaced_at < self.rename_window_ns:
+                return # already reported by the CREATE
+
+        self.on_library_file_event(event, filename)
+
+    def _confirm_delete(self, event, filename):
+        with self._lock:
+            if self._pending_deletes.get(event.src_path) is not threading.current_thread():
+                return # a CREATE arrived in time
+            del self._pending_deletes[event.src_path]
+        self.on_library_file_event(event, filename)
 
-        logging.info(f"Library change detected: {filename}. Triggering refresh.")
-        self.last_event_time = current_time
-        self.socketio.emit('library_updated', {'data': 'Library file changed'})
+    def on_library_file_event(self, event, filename):
+        # 4. Debounce (Prevent double-firing without losing the end of a burst)
+        with self._lock:
+            now = time.monotonic_ns()
+            leading = self._timer is None
+            if leading:
+                self._window_start = now
+            else:
+                self._timer.cancel()
+                self._missed = True
+            self._arm(min(self.quiet_period_ns, self._window_start + self.max_latency_ns - now))
+
+        if leading:
+            logging.info(f"Library change detected: {filename}. Triggering refresh.")
+            self._emit()
+
+    def _arm(self, delay_ns):
+        self._timer = threading.Timer(max(delay_ns, 0) / 1e9, self._flush)
+        self._timer.daemon = True
+        self._timer.start()
+
+    def _flush(self):
+        with self._lock:
+            if self._timer is not threading.current_thread():
+                return # superseded by a newer timer
+            missed = self._missed
+            self._missed = False
+            if missed:
+                # Keep the window open: more of the same burst may still be coming
+                self._window_start = time.monotonic_ns()
+                self._arm(self.quiet_period_ns)
+            else:
+                self._timer = None
+
+        if missed:
+            logging.info("Library changes settled. Triggering refresh.")
+            self._emit()
+
+    def _emit(self):
+        try: self._emit_queue.put_nowait(('library_updated', {'data': 'Library file changed'}))
+        except queue.Full: pass # a refresh is already queued; they're all the same
+
+    def _emit_loop(self):
+        while True:
+            event, payload = self._emit_queue.get()
+            try: self.socketio.emit(event, payload)
+            except Exception as e: logging.warning(f"Watcher emit failed: {e}")
 
 def _get_steam_paths():
     paths = set()
-    try:
-        hkey = winreg.OpenKey(winreg.HKEY_LOCAL_MACHINE, r"SOFTWARE\WOW6432Node\Valve\Steam")
-        steam_path = winreg.QueryValueEx(hkey, "InstallPath")[0]
-        winreg.CloseKey(hkey)
-        paths.add(os.path.join(steam_path, "steamapps"))
-    except: pass
+    try: import winreg
+    except ImportError: return paths
+    # Steam registers under the 32-bit view. Asking for that view explicitly finds it whatever the
+    # interpreter's bitness; the literal WOW6432Node path is only a fallback.
+    steam_keys = (
+        (r"SOFTWARE\Valve\Steam", winreg.KEY_READ | winreg.KEY_WOW64_32KEY),
+        (r"SOFTWARE\WOW6432Node\Valve\Steam", winreg.KEY_READ),
+    )
+    for key_path, access in steam_keys:
+        try:
+            with winreg.OpenKeyEx(winreg.HKEY_LOCAL_MACHINE, key_path, 0, access) as hkey:
+                steam_path = winreg.QueryValueEx(hkey, "InstallPath")[0]
+            paths.add(os.path.join(steam_path, "steamapps"))
+            break
+        except (OSError, TypeError): pass # Steam not installed / unexpected value type
+    else:
+        return paths
+    
+    # Extra library folders (other drives) are listed in libraryfolders.vdf; the list is the
+    # same in both copies, so the first readable one is enough
+    for vdf_path in (os.path.join(steam_path, "config", "libraryfolders.vdf"),
+                     os.path.join(steam_path, "steamapps", "libraryfolders.vdf")):
+        try:
+            with open(vdf_path, 'r', encoding='utf-8', errors='replace') as f:
+                library_roots = _LIBRARY_PATH_RE.findall(f.read())
+        except OSError: continue
+        for root in library_roots:
+            paths.add(os.path.join(root.replace('\\\\', '\\'), "steamapps"))
+        break
     return paths
 
 def _get_epic_path():
+    return os.path.join(os.environ.get('ProgramData', r'C:\ProgramData'), 'Epic', 'EpicGamesLauncher', 'Data', 'Manifests')
+
+def _is_network_path(path):
+    # ReadDirectoryChangesW can silently miss events on SMB/CIFS shares, so these get polled instead
+    if path.startswith(('\\\\', '//')):
+        return True
+    if os.name != 'nt':
+        return False
+    drive = os.path.splitdrive(os.path.abspath(path))[0]
+    if not drive:
+        return False
     try:
-        return os.path.join(os.environ.get('ProgramData', r'C:\ProgramData'), 'Epic', 'EpicGamesLauncher', 'Data', 'Manifests')
-    except: return None
+        return ctypes.windll.kernel32.GetDriveTypeW(drive + '\\') == DRIVE_REMOTE
+    except (AttributeError, OSError):
+        return False
+
+class ObserverGroup:
+    """The native and polling observers, started and stopped as one."""
+    def __init__(self, observers):
+        self.observers = observers
+
+    def start(self):
+        for observer in self.observers: observer.start()
+
+    def stop(self):
+        for observer in self.observers: observer.stop()
+
+    def join(self, timeout=None):
+        for observer in self.observers: observer.join(timeout)
 
 def start_watcher(socketio, config):
-    paths_to_watch = set()
+    # normcase'd root -> [root, recursive]. Steam manifests, Epic .item files and manual_games.json
+    # all sit directly in their folder, so those roots are watched flat; the kernel then never
+    # reports the churn inside steamapps\common, downloading, shadercache, ...
+    # Keying on the normalised path means a library reached twice (registry, libraryfolders.vdf,
+    # scan_paths) is only watched once.
+    paths_to_watch = {}
+    
+    def add_path(path, recursive):
+        key = os.path.normcase(path)
+        if key in paths_to_watch:
+            paths_to_watch[key][1] |= recursive
+            return
+        # Each root is stat'ed once, here; anything that isn't a directory is dropped
+        try:
+            if not stat.S_ISDIR(os.stat(path).st_mode): return
+        except (OSError, ValueError): return
+        paths_to_watch[key] = [path, recursive]
     
     # Add Steam
     steam_paths = _get_steam_paths()
-    paths_to_watch.update(steam_paths)
+    for path in steam_paths:
+        add_path(os.path.normpath(path), False)
         
     # Add Epic
     epic_path = _get_epic_path()
-    if epic_path and os.path.isdir(epic_path):
-        paths_to_watch.add(epic_path)
+    if epic_path:
+        add_path(os.path.normpath(epic_path), False)
 
-    # Add Custom Paths
+    # Add Custom Paths (anything but a steamapps folder may hold installerdata.xml deeper down)
     custom_paths = config.get('scan_paths', [])
     for path in custom_paths:
-        if os.path.isdir(path):
-            paths_to_watch.add(path)
+        path = os.path.normpath(path)
+        add_path(path, os.path.basename(path) != 'steamapps')
     
     # Watch the AppData folder (Only for manual_games.json)
     if os.name == 'nt':
         data_dir = os.path.join(os.getenv('LOCALAPPDATA'), 'Game Hub')
     else:
         data_dir = os.path.expanduser('~/Game Hub')
-    
-    if os.path.exists(data_dir):
-        paths_to_watch.add(data_dir)
+    add_path(os.path.normpath(data_dir), False)
 
-    if not paths_to_watch:
+    # Drop roots that sit inside a recursively watched root, or that subtree's events would
+    # be delivered twice. Ancestors are shorter, so they're always decided first.
+    roots = []
+    for key, (path, recursive) in sorted(paths_to_watch.items(), key=lambda item: len(item[0])):
+        if any(covers and key.startswith(os.path.join(kept_key, '')) for kept_key, _, covers in roots):
+            continue
+        roots.append((key, path, recursive))
+
+    if not roots:
         return None
 
+    try:
+        from watchdog.observers import Observer
+    except ImportError:
+        logging.warning("watchdog is not installed; library folders won't be watched.")
+        return None
+
+    # One handler and at most two observers (native + polling) serve every root. watchdog still
+    # runs one emitter thread per scheduled root, which is why the root list above is kept minimal.
     event_handler = GameLibraryEventHandler(socketio)
-    observer = Observer()
+    local_observer = Observer()
+    network_observer = None
     
-    for path in paths_to_watch:
-        if os.path.isdir(path):
-            try:
-                observer.schedule(event_handler, path, recursive=True)
-            except: pass
-
-    observer.start()
-    return observer
\ No newline at end of file
+    for _, path, recursive in roots:
+        if _is_network_path(path):
+            if network_observer is None:
+                from watchdog.observers.polling import PollingObserver
+                network_observer = PollingObserver(timeout=NETWORK_POLL_SECONDS)
+            observer = network_observer
+        else:
+            observer = local_observer
+        try:
+            observer.schedule(event_handler, path, recursive=recursive)
+        except OSError as e:
+            logging.warning(f"Could not watch {path}: {e}")
+
+    observers = ObserverGroup([o for o in (local_observer, network_observer) if o is not None])
+    observers.start()
+    return observers
\ No newline at end of file